@@ -1,51 +1,279 @@
 import questionary
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.progress import Progress, BarColumn, TextColumn
 from datetime import datetime, timedelta
 from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
 import os
+import pickle
+import sys
+import tempfile
 
 console = Console()
 
-# Helper function to read transactions
-def read_transactions():
+# Pre-built category bars for spending_analysis, indexed by block count (0-50)
+_BARS = ['█' * i for i in range(51)]
+
+def parse_date(date_str):
+    """Parses a YYYY-MM-DD string, falling back to strptime for anything unusual."""
+    try:
+        # isdigit() keeps int()'s extra leniency ('+1', ' 1') out, so only what strptime accepts passes
+        if (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-'
+                and date_str[0:4].isdigit() and date_str[5:7].isdigit() and date_str[8:10].isdigit()):
+            return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+    except ValueError:
+        pass
+    return datetime.strptime(date_str, '%Y-%m-%d')
+
+def clean_field(text):
+    """Makes free text safe for the comma-separated database files by replacing commas and line breaks."""
+    return text.replace(',', ' ').replace('\r', ' ').replace('\n', ' ')
+
+def format_paisa(paisa):
+    """Formats an integer paisa amount as rupees with two decimals, without going through float."""
+    sign = "-" if paisa < 0 else ""
+    rupees, rest = divmod(abs(paisa), 100)
+    return f"{sign}{rupees}.{rest:02d}"
+
+# Parsed transactions persisted between runs. The file starts with a plain-text header line
+# holding the transactions.txt (st_mtime_ns, st_size) it was parsed from, which is checked
+# before anything is unpickled: unpickling runs code, so a sidecar that arrived some other
+# way (e.g. inside a restored backup) must never get that far.
+_TX_SIDECAR = "database/transactions.cache.pkl"
+
+def _sidecar_header(key):
+    return f"transactions-cache {key[0]} {key[1]}\n".encode()
+
+def _load_transactions_sidecar(key):
+    """Returns the pickled transactions if they were parsed from this exact file version."""
+    try:
+        with open(_TX_SIDECAR, "rb") as f:
+            if f.readline() != _sidecar_header(key):
+                return None
+            cached = pickle.load(f)
+    except Exception:
+        return None
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+    return cached.get("data")
+
+def _save_transactions_sidecar(key, transactions):
+    """Atomically writes the parsed transactions next to the file they came from."""
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(_TX_SIDECAR), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_sidecar_header(key))
+            pickle.dump({"key": key, "data": transactions}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _TX_SIDECAR)
+    except Exception:
+        # The sidecar is only an optimization; a failed write just means a re-parse next run
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def _parse_transaction_line(line):
+    """Parses one transactions.txt row; None for rows without exactly five fields."""
+    # One split past the field count is enough to reject rows with extra commas
+    parts = line.strip().split(',', 5)
+    if len(parts) != 5:
+        return None
+    date_str, type, category, description, amount_str = parts
+    return {
+        "date": parse_date(date_str),
+        # Interned so every row shares one str object per type/category,
+        # which keeps the aggregation dict lookups on the identity fast path
+        "type": sys.intern(type),
+        "category": sys.intern(category),
+        "description": description,
+        "amount": int(amount_str)
+    }
+
+# The parsers below are keyed by the file's (st_mtime_ns, st_size), so any write evicts
+# the single cached entry. They return (data, error) rather than raising so that a file
+# with a bad row is reported on every call without being re-parsed each time.
+@lru_cache(maxsize=1)
+def _read_transactions_cached(mtime_ns, size):
+    key = (mtime_ns, size)
+    cached = _load_transactions_sidecar(key)
+    if cached is not None:
+        return cached, None
+
     transactions = []
     try:
         with open("database/transactions.txt", "r") as f:
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) == 5:
-                    date_str, type, category, description, amount_str = parts
-                    transactions.append({
-                        "date": datetime.strptime(date_str, '%Y-%m-%d'),
-                        "type": type,
-                        "category": category,
-                        "description": description,
-                        "amount": int(amount_str)
-                    })
-    except FileNotFoundError:
-        console.print("[yellow]No transactions found.[/yellow]")
+            lines = f.read().split('\n')
+        for line in lines:
+            transaction = _parse_transaction_line(line)
+            if transaction is not None:
+                transactions.append(transaction)
     except Exception as e:
-        console.print(f"[red]Error reading transactions: {e}[/red]")
-    return transactions
+        return transactions, e
+    _save_transactions_sidecar(key, transactions)
+    return transactions, None
 
-# Helper function to read budgets
-def read_budgets():
+@lru_cache(maxsize=1)
+def _read_budgets_cached(mtime_ns, size):
     budgets = {}
     try:
         with open("database/budgets.txt", "r") as f:
             for line in f:
-                parts = line.strip().split(',')
+                parts = line.strip().split(',', 2)
                 if len(parts) == 2:
                     category, amount = parts
                     budgets[category] = int(amount)
+    except Exception as e:
+        return budgets, e
+    return budgets, None
+
+# Helper function to read transactions
+def read_transactions():
+    try:
+        st = os.stat("database/transactions.txt")
+    except FileNotFoundError:
+        console.print("[yellow]No transactions found.[/yellow]")
+        return []
+    if st.st_size == 0:
+        return []
+
+    transactions, error = _read_transactions_cached(st.st_mtime_ns, st.st_size)
+    if isinstance(error, FileNotFoundError):
+        console.print("[yellow]No transactions found.[/yellow]")
+    elif error is not None:
+        console.print(f"[red]Error reading transactions: {error}[/red]")
+    return transactions
+
+# Helper function to read budgets
+def read_budgets():
+    try:
+        st = os.stat("database/budgets.txt")
     except FileNotFoundError:
         console.print("[yellow]No budgets set yet.[/yellow]")
-    except Exception as e:
-        console.print(f"[red]Error reading budgets: {e}[/red]")
+        return {}
+    if st.st_size == 0:
+        return {}
+
+    budgets, error = _read_budgets_cached(st.st_mtime_ns, st.st_size)
+    if isinstance(error, FileNotFoundError):
+        console.print("[yellow]No budgets set yet.[/yellow]")
+    elif error is not None:
+        console.print(f"[red]Error reading budgets: {error}[/red]")
     return budgets
 
+@lru_cache(maxsize=4)
+def _month_bounds(year, month):
+    """Returns midnight on the first day of the given month and of the month before it."""
+    start = datetime(year, month, 1)
+    previous_month_end = start - timedelta(days=1)
+    return start, datetime(previous_month_end.year, previous_month_end.month, 1)
+
+def monthly_category_totals(transactions, month_keys, types=("income", "expense")):
+    """Sums amounts per category for each (year, month) in month_keys in one pass.
+
+    Returns {(year, month): {type: {category: paisa}}} for each of the given types.
+    """
+    totals = {key: {type: defaultdict(int) for type in types} for key in month_keys}
+    get_month = totals.get  # bound once; this loop runs for every transaction
+    for t in transactions:
+        date = t["date"]
+        month_totals = get_month((date.year, date.month))
+        if month_totals is None:
+            continue
+        by_category = month_totals.get(t["type"])
+        if by_category is not None:
+            by_category[t["category"]] += t["amount"]
+    return totals
+
+def transactions_file_key():
+    """Returns the (st_mtime_ns, st_size) of transactions.txt, or None if it does not exist."""
+    try:
+        st = os.stat("database/transactions.txt")
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+# Per-month expense sums live in database/agg_YYYY_MM.txt. The first line records the
+# transactions.txt key they were computed for; any write that doesn't go through
+# record_transaction_in_aggregate() changes that key, and the file is rebuilt on next read.
+def _month_aggregate_path(year, month):
+    return f"database/agg_{year}_{month:02d}.txt"
+
+def _read_month_aggregate(year, month, key):
+    """Returns the stored {category: paisa} expenses if they match the given file key."""
+    try:
+        with open(_month_aggregate_path(year, month), "r") as f:
+            if f.readline().strip() != f"#{key[0]},{key[1]}":
+                return None
+            expenses = {}
+            for line in f:
+                parts = line.strip().split(',')
+                if len(parts) == 2:
+                    category, amount = parts
+                    expenses[category] = int(amount)
+    except Exception:
+        return None
+    return expenses
+
+def _write_month_aggregate(year, month, key, expenses):
+    """Atomically rewrites a month's aggregate file; failures only cost a rebuild later."""
+    path = _month_aggregate_path(year, month)
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(f"#{key[0]},{key[1]}\n")
+            for category, amount in expenses.items():
+                f.write(f"{category},{amount}\n")
+        os.replace(tmp_path, path)
+    except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def read_month_expenses(year, month):
+    """Returns {category: paisa} of expenses for a month, reading only K aggregate lines when current."""
+    key = transactions_file_key()
+    if key is not None:
+        expenses = _read_month_aggregate(year, month, key)
+        if expenses is not None:
+            return expenses
+
+    transactions = read_transactions()
+    expenses = dict(monthly_category_totals(transactions, ((year, month),), ("expense",))[(year, month)]["expense"])
+    # Only persist sums from a clean parse of the file version we started with
+    if key is not None and key[1] > 0 and key == transactions_file_key() and _read_transactions_cached(*key)[1] is None:
+        _write_month_aggregate(year, month, key, expenses)
+    return expenses
+
+def record_transaction_in_aggregate(previous_key, line):
+    """Updates the month's aggregate after `line` was appended to transactions.txt.
+
+    previous_key is transactions_file_key() from just before the append. If the aggregate
+    wasn't current at that point, or the file grew by more than this line (another writer,
+    such as the web app, appended in between), it is left alone and rebuilt lazily by
+    read_month_expenses().
+    """
+    try:
+        transaction = _parse_transaction_line(line)
+    except ValueError:
+        return # read_transactions() can't parse this file either, so nothing may be cached
+    if transaction is None:
+        return
+    date = transaction["date"]
+    if previous_key is None:
+        expenses = {} # The file was just created, so this month had nothing before
+    else:
+        expenses = _read_month_aggregate(date.year, date.month, previous_key)
+        if expenses is None:
+            return
+    if transaction["type"] == "expense":
+        category = transaction["category"]
+        expenses[category] = expenses.get(category, 0) + transaction["amount"]
+    new_key = transactions_file_key()
+    previous_size = 0 if previous_key is None else previous_key[1]
+    if new_key is not None and new_key[1] == previous_size + len((line + "\n").encode()):
+        _write_month_aggregate(date.year, date.month, new_key, expenses)
+
 def spending_analysis():
     """Performs and displays spending analysis."""
     console.print("\n[bold magenta]----- Spending Analysis ----- [/bold magenta]")
@@ -54,43 +282,31 @@ def spending_analysis():
         console.print("[yellow]No transactions available for analysis.[/yellow]")
         return
 
-    current_month_expenses = defaultdict(int)
-    last_month_expenses = defaultdict(int)
-    current_month_total_expense = 0
-    last_month_total_expense = 0
-
     today = datetime.now()
-    current_month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    # Calculate last month's start and end
-    first_day_of_current_month = today.replace(day=1)
-    last_month_end = first_day_of_current_month - timedelta(days=1)
-    last_month_start = last_month_end.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    current_month_start, last_month_start = _month_bounds(today.year, today.month)
 
-
-    for t in transactions:
-        if t["type"] == "expense":
-            if t["date"].month == today.month and t["date"].year == today.year:
-                current_month_expenses[t["category"]] += t["amount"]
-                current_month_total_expense += t["amount"]
-            elif t["date"].month == last_month_start.month and t["date"].year == last_month_start.year:
-                last_month_expenses[t["category"]] += t["amount"]
-                last_month_total_expense += t["amount"]
+    current_key = (today.year, today.month)
+    last_key = (last_month_start.year, last_month_start.month)
+    monthly_totals = monthly_category_totals(transactions, (current_key, last_key), ("expense",))
+    current_month_expenses = monthly_totals[current_key]["expense"]
+    last_month_expenses = monthly_totals[last_key]["expense"]
+    current_month_total_expense = sum(current_month_expenses.values())
+    last_month_total_expense = sum(last_month_expenses.values())
 
     if current_month_total_expense == 0:
         console.print("[yellow]No expenses recorded for the current month.[/yellow]")
         return
 
     # 1. Breakdown by category (ASCII pie chart)
+    sorted_expenses = sorted(current_month_expenses.items(), key=itemgetter(1), reverse=True)
     console.print("\n[bold]Spending by Category (Current Month):[/bold]")
-    for category, amount in sorted(current_month_expenses.items(), key=lambda item: item[1], reverse=True):
+    for category, amount in sorted_expenses:
         percentage = (amount / current_month_total_expense) * 100
-        bar = '█' * int(percentage // 2) # Each block represents 2%
+        bar = _BARS[min(int(percentage // 2), 50)] # Each block represents 2%
         console.print(f"{category:<15} {bar:<25} {percentage:.1f}% ({amount / 100:.2f})")
 
     # 2. Top 3 spending categories
     console.print("\n[bold]Top 3 Spending Categories (Current Month):[/bold]")
-    sorted_expenses = sorted(current_month_expenses.items(), key=lambda item: item[1], reverse=True)
     for i, (category, amount) in enumerate(sorted_expenses[:3]):
         console.print(f"{i+1}. {category}: {amount / 100:.2f}")
 
@@ -124,24 +340,16 @@ def income_analysis():
         console.print("[yellow]No transactions available for analysis.[/yellow]")
         return
 
-    current_month_income = defaultdict(int)
-    last_month_income = defaultdict(int)
-    current_month_total_income = 0
-    last_month_total_income = 0
-
     today = datetime.now()
-    first_day_of_current_month = today.replace(day=1)
-    last_month_end = first_day_of_current_month - timedelta(days=1)
-    last_month_start = last_month_end.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    _, last_month_start = _month_bounds(today.year, today.month)
 
-    for t in transactions:
-        if t["type"] == "income":
-            if t["date"].month == today.month and t["date"].year == today.year:
-                current_month_income[t["category"]] += t["amount"]
-                current_month_total_income += t["amount"]
-            elif t["date"].month == last_month_start.month and t["date"].year == last_month_start.year:
-                last_month_income[t["category"]] += t["amount"]
-                last_month_total_income += t["amount"]
+    current_key = (today.year, today.month)
+    last_key = (last_month_start.year, last_month_start.month)
+    monthly_totals = monthly_category_totals(transactions, (current_key, last_key), ("income",))
+    current_month_income = monthly_totals[current_key]["income"]
+    last_month_income = monthly_totals[last_key]["income"]
+    current_month_total_income = sum(current_month_income.values())
+    last_month_total_income = sum(last_month_income.values())
 
     if current_month_total_income == 0:
         console.print("[yellow]No income recorded for the current month.[/yellow]")
@@ -149,7 +357,7 @@ def income_analysis():
 
     # 1. Income by source
     console.print("\n[bold]Income by Source (Current Month):[/bold]")
-    for source, amount in sorted(current_month_income.items(), key=lambda item: item[1], reverse=True):
+    for source, amount in sorted(current_month_income.items(), key=itemgetter(1), reverse=True):
         console.print(f"- {source}: {amount / 100:.2f}")
 
     # 2. Total income this month
@@ -189,35 +397,47 @@ def savings_analysis():
         console.print("[yellow]No transactions available for analysis.[/yellow]")
         return
 
-    monthly_data = defaultdict(lambda: {"income": 0, "expense": 0})
     today = datetime.now()
 
+    # The last 3 calendar months, oldest to newest, stepped exactly rather than by 30-day jumps
+    month_keys = []
+    year, month = today.year, today.month
+    for _ in range(3):
+        month_keys.append((year, month))
+        month -= 1
+        if month == 0:
+            month = 12
+            year -= 1
+    month_keys.reverse()
+
+    # Totals for the wanted months only; other months are skipped by the membership check
+    income_by_month = dict.fromkeys(month_keys, 0)
+    expense_by_month = dict.fromkeys(month_keys, 0)
     for t in transactions:
-        month_year = (t["date"].year, t["date"].month)
-        if t["type"] == "income":
-            monthly_data[month_year]["income"] += t["amount"]
-        elif t["type"] == "expense":
-            monthly_data[month_year]["expense"] += t["amount"]
+        date = t["date"]
+        key = (date.year, date.month)
+        if key not in income_by_month:
+            continue
+        type = t["type"]
+        if type == "income":
+            income_by_month[key] += t["amount"]
+        elif type == "expense":
+            expense_by_month[key] += t["amount"]
 
-    # Get data for the last 3 months
     savings_trend = []
-    for i in range(3):
-        target_month = today.replace(day=1) - timedelta(days=30 * i) # Approximate
-        target_month_year = (target_month.year, target_month.month)
-        
-        income = monthly_data[target_month_year]["income"]
-        expense = monthly_data[target_month_year]["expense"]
+    for year, month in month_keys:
+        income = income_by_month[(year, month)]
+        expense = expense_by_month[(year, month)]
         savings = income - expense
         savings_rate = (savings / income * 100) if income > 0 else 0
         
         savings_trend.append({
-            "month": target_month.strftime('%Y-%m'),
+            "month": f"{year}-{month:02d}",
             "income": income,
             "expense": expense,
             "savings": savings,
             "savings_rate": savings_rate
         })
-    savings_trend.reverse() # Oldest to newest
 
     current_month_savings = savings_trend[-1]["savings"]
     current_month_savings_rate = savings_trend[-1]["savings_rate"]
@@ -267,20 +487,15 @@ def financial_health_score():
         console.print("[yellow]No transactions available to calculate financial health score.[/yellow]")
         return
     
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-
-    total_income_current_month = 0
-    total_expense_current_month = 0
-    expenses_by_category_current_month = defaultdict(int)
-
-    for t in transactions:
-        if t["date"].month == current_month and t["date"].year == current_year:
-            if t["type"] == "income":
-                total_income_current_month += t["amount"]
-            elif t["type"] == "expense":
-                total_expense_current_month += t["amount"]
-                expenses_by_category_current_month[t["category"]] += t["amount"]
+    now = datetime.now()
+    current_month = now.month
+    current_year = now.year
+
+    current_key = (current_year, current_month)
+    current_month_totals = monthly_category_totals(transactions, (current_key,))[current_key]
+    expenses_by_category_current_month = current_month_totals["expense"]
+    total_income_current_month = sum(current_month_totals["income"].values())
+    total_expense_current_month = sum(expenses_by_category_current_month.values())
     
     score = 0
     recommendations = []
@@ -304,7 +519,7 @@ def financial_health_score():
     # 2. Budget Adherence (30 points)
     budget_adherence_score = 0
     if budgets_data:
-        over_budget_categories = 0
+        over_budget_categories = []
         total_budget_amount = 0
         total_spent_against_budget = 0
         
@@ -313,17 +528,17 @@ def financial_health_score():
             total_budget_amount += budget_amount
             total_spent_against_budget += min(spent, budget_amount) # Only count spent up to budget for adherence
             if spent > budget_amount:
-                over_budget_categories += 1
+                over_budget_categories.append(category)
         
         if total_budget_amount > 0:
-            if over_budget_categories == 0 and total_spent_against_budget <= total_budget_amount:
+            if not over_budget_categories and total_spent_against_budget <= total_budget_amount:
                 budget_adherence_score = 30
-            elif over_budget_categories == 0 and total_spent_against_budget > total_budget_amount: # Spent more than total budget but not over individual categories
+            elif not over_budget_categories and total_spent_against_budget > total_budget_amount: # Spent more than total budget but not over individual categories
                 budget_adherence_score = 20
                 recommendations.append("Review your overall budget, as total spending exceeded total allocated budget.")
-            elif over_budget_categories > 0:
+            elif over_budget_categories:
                 budget_adherence_score = 10
-                recommendations.append(f"Address overspending in categories: {[c for c, b in budgets_data.items() if expenses_by_category_current_month.get(c, 0) > b]}.")
+                recommendations.append(f"Address overspending in categories: {over_budget_categories}.")
         else:
             recommendations.append("Set up budgets for better financial control.")
     else:
@@ -371,70 +586,71 @@ def financial_health_score():
 
 def generate_comprehensive_report():
     """Generates and displays a comprehensive financial report."""
+    # The banner goes out first so messages from the readers below still appear under it
     console.print("\n[bold magenta]----- Comprehensive Monthly Financial Report ----- [/bold magenta]")
-    console.print(f"[bold]Report for:[/bold] {datetime.now().strftime('%B %Y')}\n")
+    now = datetime.now()
+    console.print(f"[bold]Report for:[/bold] {now.strftime('%B %Y')}\n")
 
     transactions = read_transactions()
     budgets_data = read_budgets()
 
+    # Collect the rest of the report and hand it to Rich in one print call
+    report = []
+
+    def emit(markup=""):
+        report.append(console.render_str(markup)) # Same markup and number highlighting as console.print
+
     if not transactions:
-        console.print("[yellow]No transactions available to generate a comprehensive report.[/yellow]")
+        emit("[yellow]No transactions available to generate a comprehensive report.[/yellow]")
+        console.print(Group(*report))
         return
     
-    current_month = datetime.now().month
-    current_year = datetime.now().year
+    current_month = now.month
+    current_year = now.year
 
-    # Filter current month's transactions
-    current_month_transactions = [
-        t for t in transactions 
-        if t["date"].month == current_month and t["date"].year == current_year
-    ]
+    # Income by source and expenses by category for the current month, in one pass
+    current_key = (current_year, current_month)
+    current_month_totals = monthly_category_totals(transactions, (current_key,))[current_key]
+    income_by_source = current_month_totals["income"]
+    expenses_by_category = current_month_totals["expense"]
 
-    total_income = sum(t["amount"] for t in current_month_transactions if t["type"] == "income")
-    total_expense = sum(t["amount"] for t in current_month_transactions if t["type"] == "expense")
+    total_income = sum(income_by_source.values())
+    total_expense = sum(expenses_by_category.values())
     net_savings = total_income - total_expense
 
     # Month Overview
-    console.print("[bold underline]1. Month Overview[/underline][/bold]")
-    console.print(f"  Total Income: [green]{total_income / 100:.2f}[/green]")
-    console.print(f"  Total Expenses: [red]{total_expense / 100:.2f}[/red]")
+    emit("[bold underline]1. Month Overview[/bold underline]")
+    emit(f"  Total Income: [green]{total_income / 100:.2f}[/green]")
+    emit(f"  Total Expenses: [red]{total_expense / 100:.2f}[/red]")
     net_savings_style = "green" if net_savings >= 0 else "red"
-    console.print(f"  Net Savings: [{net_savings_style}]{net_savings / 100:.2f}[/{net_savings_style}]\n")
+    emit(f"  Net Savings: [{net_savings_style}]{net_savings / 100:.2f}[/{net_savings_style}]\n")
 
     # Income Summary
-    console.print("[bold underline]2. Income Summary[/underline][/bold]")
-    income_by_source = defaultdict(int)
-    for t in current_month_transactions:
-        if t["type"] == "income":
-            income_by_source[t["category"]] += t["amount"]
-    
+    emit("[bold underline]2. Income Summary[/bold underline]")
     if income_by_source:
-        for source, amount in sorted(income_by_source.items(), key=lambda item: item[1], reverse=True):
-            console.print(f"  - {source}: {amount / 100:.2f}")
+        for source, amount in sorted(income_by_source.items(), key=itemgetter(1), reverse=True):
+            emit(f"  - {source}: {amount / 100:.2f}")
     else:
-        console.print("  No income recorded for this month.")
-    console.print("")
+        emit("  No income recorded for this month.")
+    emit()
 
     # Expense Summary
-    console.print("[bold underline]3. Expense Summary[/underline][/bold]")
-    expenses_by_category = defaultdict(int)
-    for t in current_month_transactions:
-        if t["type"] == "expense":
-            expenses_by_category[t["category"]] += t["amount"]
-    
+    emit("[bold underline]3. Expense Summary[/bold underline]")
     if expenses_by_category:
-        for category, amount in sorted(expenses_by_category.items(), key=lambda item: item[1], reverse=True):
-            console.print(f"  - {category}: {amount / 100:.2f}")
+        sorted_expenses = sorted(expenses_by_category.items(), key=itemgetter(1), reverse=True)
+        for category, amount in sorted_expenses:
+            emit(f"  - {category}: {amount / 100:.2f}")
         
-        console.print("\n  [bold]Top 3 Spending Categories:[/bold]")
-        for i, (category, amount) in enumerate(sorted(expenses_by_category.items(), key=lambda item: item[1], reverse=True)[:3]):
-            console.print(f"  {i+1}. {category}: {amount / 100:.2f}")
+        emit("\n  [bold]Top 3 Spending Categories:[/bold]")
+        for i, (category, amount) in enumerate(sorted_expenses[:3]):
+            emit(f"  {i+1}. {category}: {amount / 100:.2f}")
     else:
-        console.print("  No expenses recorded for this month.")
-    console.print("")
+        emit("  No expenses recorded for this month.")
+    emit()
 
     # Budget Performance
-    console.print("[bold underline]4. Budget Performance[/underline][/bold]")
+    emit("[bold underline]4. Budget Performance[/bold underline]")
+    over_budget_categories = []
     if budgets_data:
         budget_table = Table()
         budget_table.add_column("Category", style="cyan")
@@ -454,6 +670,7 @@ def generate_comprehensive_report():
             if spent_amount > budget_amount:
                 status_style = "red"
                 status_text = "OVER BUDGET"
+                over_budget_categories.append(category)
             
             budget_table.add_row(
                 category,
@@ -462,47 +679,47 @@ def generate_comprehensive_report():
                 f"[{status_style}]{remaining_amount / 100:.2f}[/{status_style}]",
                 f"[{status_style}]{status_text}[/{status_style}]"
             )
-        console.print(budget_table)
+        report.append(budget_table)
     else:
-        console.print("  No budgets set for this month.")
-    console.print("")
+        emit("  No budgets set for this month.")
+    emit()
 
     # Savings Achieved (re-using logic from savings_analysis)
-    console.print("[bold underline]5. Savings Overview[/underline][/bold]")
+    emit("[bold underline]5. Savings Overview[/bold underline]")
     if total_income > 0:
         savings_rate = (net_savings / total_income * 100)
-        console.print(f"  Net Savings: [{net_savings_style}]{net_savings / 100:.2f}[/{net_savings_style}]")
-        console.print(f"  Savings Rate: {savings_rate:.1f}%")
+        emit(f"  Net Savings: [{net_savings_style}]{net_savings / 100:.2f}[/{net_savings_style}]")
+        emit(f"  Savings Rate: {savings_rate:.1f}%")
         if savings_rate >= 20:
-            console.print("[green]  Excellent savings rate![/green]")
+            emit("[green]  Excellent savings rate![/green]")
         elif savings_rate >= 10:
-            console.print("[yellow]  Good progress on savings.[/yellow]")
+            emit("[yellow]  Good progress on savings.[/yellow]")
         else:
-            console.print("[red]  Savings rate needs improvement.[/red]")
+            emit("[red]  Savings rate needs improvement.[/red]")
     else:
-        console.print("  No income recorded, so savings cannot be calculated.")
-    console.print("")
+        emit("  No income recorded, so savings cannot be calculated.")
+    emit()
 
     # Simple Next Month Projections
-    console.print("[bold underline]6. Next Month Projections (Simplified)[/underline][/bold]")
+    emit("[bold underline]6. Next Month Projections (Simplified)[/bold underline]")
     if total_income > 0 and total_expense > 0:
         projected_savings = total_income - total_expense # Assume similar spending/income
         proj_style = "green" if projected_savings >= 0 else "red"
-        console.print(f"  If current trends continue, projected net savings: [{proj_style}]{projected_savings / 100:.2f}[/{proj_style}]")
+        emit(f"  If current trends continue, projected net savings: [{proj_style}]{projected_savings / 100:.2f}[/{proj_style}]")
     else:
-        console.print("  Not enough data to make projections.")
-    console.print("")
+        emit("  Not enough data to make projections.")
+    emit()
 
     # Recommendations from Financial Health Score (simplified)
-    console.print("[bold underline]7. Recommendations[/underline][/bold]")
+    emit("[bold underline]7. Recommendations[/bold underline]")
     # This would ideally call financial_health_score and extract recommendations
     # For simplicity, we'll give some general ones based on current month's data
     if net_savings < 0:
-        console.print("  - Your expenses exceeded your income this month. Review spending to identify areas for reduction.")
+        emit("  - Your expenses exceeded your income this month. Review spending to identify areas for reduction.")
     elif total_income > 0 and (net_savings / total_income) < 0.1:
-        console.print("  - Aim to increase your savings rate to at least 10-20% of your income.")
-    if budgets_data:
-        over_budget_categories = [cat for cat, budget_amount in budgets_data.items() if expenses_by_category.get(cat, 0) > budget_amount]
-        if over_budget_categories:
-            console.print(f"  - Pay attention to spending in categories like: [red]{', '.join(over_budget_categories)}[/red]")
-    console.print("")
+        emit("  - Aim to increase your savings rate to at least 10-20% of your income.")
+    if over_budget_categories:
+        emit(f"  - Pay attention to spending in categories like: [red]{', '.join(over_budget_categories)}[/red]")
+    emit()
+
+    console.print(Group(*report))
@@ -5,6 +5,8 @@ from rich.progress import Progress, BarColumn, TextColumn
 from datetime import datetime
 import os
 
+from features.analytics.analytics import read_month_expenses
+
 console = Console()
 
 def set_budget():
@@ -32,13 +34,33 @@ def set_budget():
     except Exception as e:
         console.print(f"[red]An error occurred: {e}[/red]")
 
+_PROGRESS_BAR_LENGTH = 20
+
+# (style, status cell, progress bars indexed by filled length) for each bucket.
+_STATUS_CELLS = {
+    style: (
+        style,
+        f"[{style}]{label}[/{style}]",
+        [f"[{style}]{'█' * i}{'░' * (_PROGRESS_BAR_LENGTH - i)}[/]" for i in range(_PROGRESS_BAR_LENGTH + 1)],
+    )
+    for style, label in (("green", "OK"), ("yellow", "Warning"), ("red", "OVER"))
+}
+
+def _budget_status(utilization_percent):
+    """Returns the (style, status cell, bars) for a utilization: OK under 70%, Warning up to 100%, then OVER."""
+    if utilization_percent < 70:
+        return _STATUS_CELLS["green"]
+    if utilization_percent <= 100:
+        return _STATUS_CELLS["yellow"]
+    return _STATUS_CELLS["red"]
+
 def view_budgets():
     """Displays all set budgets and tracks spending against them."""
-    current_month = datetime.now().month
-    current_year = datetime.now().year
+    now = datetime.now()
+    current_month = now.month
+    current_year = now.year
 
     budgets = {}
-    expenses = {}
 
     try:
         with open("database/budgets.txt", "r") as f:
@@ -58,21 +80,10 @@ def view_budgets():
         console.print("[yellow]No budgets set yet.[/yellow]")
         return
 
-    try:
-        with open("database/transactions.txt", "r") as f:
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) == 5:
-                    date_str, type, category, _, amount_str = parts
-                    transaction_date = datetime.strptime(date_str, '%Y-%m-%d')
-                    if transaction_date.month == current_month and transaction_date.year == current_year and type == 'expense':
-                        expenses[category] = expenses.get(category, 0) + int(amount_str)
-    except FileNotFoundError:
-        console.print("[yellow]No transactions recorded for the current month.[/yellow]")
-    except Exception as e:
-        console.print(f"[red]Error reading transactions: {e}[/red]")
+    # Served from the month's aggregate file when it is current, else rebuilt from transactions.txt
+    expenses = read_month_expenses(current_year, current_month)
 
-    table = Table(title=f"Monthly Budgets ({datetime.now().strftime('%B %Y')})")
+    table = Table(title=f"Monthly Budgets ({now.strftime('%B %Y')})")
     table.add_column("Category", style="cyan", min_width=12)
     table.add_column("Budget", justify="right", style="green")
     table.add_column("Spent", justify="right", style="red")
@@ -82,6 +93,7 @@ def view_budgets():
 
     total_budget = 0
     total_spent = 0
+    over_budget_categories = []
 
     for category, budget_amount in budgets.items():
         spent_amount = expenses.get(category, 0)
@@ -92,24 +104,13 @@ def view_budgets():
 
         utilization_percent = (spent_amount / budget_amount * 100) if budget_amount > 0 else 0
 
-        status_style = ""
-        status_text = ""
-        if utilization_percent < 70:
-            status_style = "green"
-            status_text = "OK"
-        elif utilization_percent >= 70 and utilization_percent <= 100:
-            status_style = "yellow"
-            status_text = "Warning"
-        else:
-            status_style = "red"
-            status_text = "OVER"
+        status_style, status_cell, progress_bars = _budget_status(utilization_percent)
+        if spent_amount > budget_amount:
+            over_budget_categories.append(category)
         
-        # Progress bar
-        progress_bar_length = 20
-        filled_length = int(progress_bar_length * (spent_amount / budget_amount)) if budget_amount > 0 else 0
-        filled_length = min(filled_length, progress_bar_length) # Cap at max length
-        empty_length = progress_bar_length - filled_length
-        progress_bar = f"[{status_style}]{'█' * filled_length}{'░' * empty_length}[/]"
+        # Progress bar (integer math, capped at max length)
+        filled_length = spent_amount * _PROGRESS_BAR_LENGTH // budget_amount if budget_amount > 0 else 0
+        progress_bar = progress_bars[max(0, min(filled_length, _PROGRESS_BAR_LENGTH))]
 
 
         table.add_row(
@@ -118,7 +119,7 @@ def view_budgets():
             f"{spent_amount / 100:.2f}",
             f"[bold {status_style}]{remaining_amount / 100:.2f}[/bold {status_style}]",
             f"{progress_bar} {utilization_percent:.1f}%",
-            f"[{status_style}]{status_text}[/{status_style}]"
+            status_cell
         )
     
     console.print(table)
@@ -127,13 +128,7 @@ def view_budgets():
     overall_remaining = total_budget - total_spent
     overall_utilization_percent = (total_spent / total_budget * 100) if total_budget > 0 else 0
     
-    overall_status_style = ""
-    if overall_utilization_percent < 70:
-        overall_status_style = "green"
-    elif overall_utilization_percent >= 70 and overall_utilization_percent <= 100:
-        overall_status_style = "yellow"
-    else:
-        overall_status_style = "red"
+    overall_status_style = _budget_status(overall_utilization_percent)[0]
 
     console.print("\n[bold]Overall Monthly Summary:[/bold]")
     console.print(f"  Total Budget: [green]{total_budget / 100:.2f}[/green]")
@@ -145,7 +140,6 @@ def view_budgets():
         console.print("[bold red]  Warning: You are over your total budget for the month![/bold red]")
     
     console.print("\n[bold]Recommendations:[/bold]")
-    over_budget_categories = [cat for cat, budget_amount in budgets.items() if expenses.get(cat, 0) > budget_amount]
     if over_budget_categories:
         console.print(f"  - Consider reviewing spending in: [red]{', '.join(over_budget_categories)}[/red]")
     
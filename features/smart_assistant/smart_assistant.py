@@ -1,14 +1,70 @@
 import questionary
 from rich.console import Console
 from rich.table import Table
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+from calendar import monthrange
+from collections import defaultdict, namedtuple
+from functools import lru_cache
 import os
 
-from features.analytics.analytics import read_transactions, read_budgets
+from features.analytics.analytics import read_transactions, read_budgets, read_month_expenses, transactions_file_key, format_paisa, clean_field
 
 console = Console()
 
+# Essential categories left out of savings suggestions (compared lowercased)
+_NON_DISCRETIONARY = frozenset({"bills", "health", "transport"})
+
+# Goal progress bars are sliced from these instead of being rebuilt per goal
+_GOAL_BAR_LENGTH = 40
+_FULL_BAR = '█' * _GOAL_BAR_LENGTH
+_EMPTY_BAR = '░' * _GOAL_BAR_LENGTH
+
+@lru_cache(maxsize=1)
+def _totals_cached(mtime_ns, size):
+    """All-time (income, expense) for the transactions file at the given (mtime_ns, size)."""
+    total_income = total_expense = 0
+    for t in read_transactions():
+        if t["type"] == "income":
+            total_income += t["amount"]
+        elif t["type"] == "expense":
+            total_expense += t["amount"]
+    return total_income, total_expense
+
+
+def _get_totals():
+    """Returns all-time (total_income, total_expense), only rescanning when transactions.txt changes."""
+    key = transactions_file_key()
+    if key is None:
+        read_transactions() # Reports the missing file
+        return 0, 0
+    return _totals_cached(*key)
+
+
+_MonthSummary = namedtuple("_MonthSummary", "month_income month_expense today_expense month_cat_expense today_expenses")
+
+
+def _aggregate(transactions, today):
+    """Sums this month's income, expenses (total and per category) and today's expenses in one pass."""
+    month_income = month_expense = today_expense = 0
+    month_cat_expense = defaultdict(int)
+    today_expenses = []
+    current_year, current_month, today_date = today.year, today.month, today.date()
+    for t in transactions:
+        tdate = t["date"]
+        if tdate.month != current_month or tdate.year != current_year:
+            continue
+        ttype = t["type"]
+        amount = t["amount"]
+        if ttype == "expense":
+            month_expense += amount
+            month_cat_expense[t["category"]] += amount
+            if tdate.date() == today_date:
+                today_expense += amount
+                today_expenses.append(t)
+        elif ttype == "income":
+            month_income += amount
+    return _MonthSummary(month_income, month_expense, today_expense, month_cat_expense, today_expenses)
+
 
 def daily_financial_check():
     """Provides a daily financial check-up."""
@@ -18,19 +74,17 @@ def daily_financial_check():
 
     transactions = read_transactions()
     budgets = read_budgets()
+    summary = _aggregate(transactions, today)
 
     # Calculate today's spending
-    todays_spending = sum(
-        t["amount"] for t in transactions 
-        if t["date"].date() == today.date() and t["type"] == "expense"
-    )
-    console.print(f"Today's Spending: [bold red]{todays_spending / 100:.2f}[/bold red]")
+    todays_spending = summary.today_expense
+    console.print(f"Today's Spending: [bold red]{format_paisa(todays_spending)}[/bold red]")
 
     # Calculate daily budget
     if budgets:
         total_monthly_budget = sum(budgets.values())
-        days_in_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        daily_budget = total_monthly_budget / days_in_month.day if days_in_month.day > 0 else 0
+        days_in_month = monthrange(today.year, today.month)[1]
+        daily_budget = total_monthly_budget / days_in_month
         remaining_daily_budget = daily_budget - todays_spending
         
         daily_budget_style = "green" if remaining_daily_budget >= 0 else "red"
@@ -40,20 +94,21 @@ def daily_financial_check():
         console.print("No budgets set. Set budgets to get daily estimates.")
 
     # Alerts
-    spending_alerts()
+    spending_alerts(transactions, budgets)
 
     # Tip of the day
     console.print("\n[bold]💡 Tip of the Day:[/bold]")
-    _get_daily_tip(transactions, budgets)
+    _get_daily_tip(budgets)
 
 
-def _get_daily_tip(transactions, budgets):
+def _get_daily_tip(budgets):
     """Helper to provide a simple daily financial tip."""
     if not budgets:
         console.print("  - Set budgets for your main spending categories to better control your finances.")
         return
     
-    savings_this_month = sum(t["amount"] for t in transactions if t["type"] == "income") - sum(t["amount"] for t in transactions if t["type"] == "expense")
+    total_income, total_expense = _get_totals()
+    savings_this_month = total_income - total_expense
     if savings_this_month > 0:
         console.print("  - You are on track to save this month. Consider allocating a portion of your savings to an investment.")
     else:
@@ -65,24 +120,21 @@ def smart_recommendations():
     console.print("\n[bold cyan]----- Smart Recommendations ----- [/bold cyan]")
     transactions = read_transactions()
     budgets = read_budgets()
+    summary = _aggregate(transactions, datetime.now())
     recommendations = []
+    over_budget_categories = []
 
     # Recommendation Engine Rules
     # 1. Overspending Categories
     if budgets:
-        current_month_expenses = defaultdict(int)
-        today = datetime.now()
-        for t in transactions:
-            if t["type"] == "expense" and t["date"].month == today.month and t["date"].year == today.year:
-                current_month_expenses[t["category"]] += t["amount"]
-
+        current_month_expenses = summary.month_cat_expense
         over_budget_categories = [cat for cat, budget in budgets.items() if current_month_expenses.get(cat, 0) > budget]
         if over_budget_categories:
             recommendations.append(f"You are over budget in {', '.join(over_budget_categories)}. Consider reducing spending in these areas.")
 
     # 2. Low Savings Rate
-    total_income = sum(t["amount"] for t in transactions if t["type"] == "income" and t["date"].month == datetime.now().month)
-    total_expense = sum(t["amount"] for t in transactions if t["type"] == "expense" and t["date"].month == datetime.now().month)
+    total_income = summary.month_income
+    total_expense = summary.month_expense
     savings_rate = ((total_income - total_expense) / total_income * 100) if total_income > 0 else -100
     if savings_rate < 10:
         recommendations.append("Your savings rate is low. Try the 50/30/20 rule: 50% on needs, 30% on wants, and 20% on savings.")
@@ -104,24 +156,22 @@ def smart_recommendations():
         console.print("\n[green]You are on the right track. Keep up the good work![/green]")
     
     # Also show current alerts
-    spending_alerts()
+    spending_alerts(transactions, budgets)
 
 
-def spending_alerts():
-    """Checks for and displays any spending alerts."""
+def spending_alerts(transactions=None, budgets=None):
+    """Checks for and displays any spending alerts, reusing already loaded data when given."""
     console.print("\n[bold]⚠️ Active Alerts:[/bold]")
-    transactions = read_transactions()
-    budgets = read_budgets()
+    if transactions is None:
+        transactions = read_transactions()
+    if budgets is None:
+        budgets = read_budgets()
     alerts = []
+    summary = _aggregate(transactions, datetime.now())
     
     # Budget alerts
     if budgets:
-        current_month_expenses = defaultdict(int)
-        today = datetime.now()
-        for t in transactions:
-            if t["type"] == "expense" and t["date"].month == today.month and t["date"].year == today.year:
-                current_month_expenses[t["category"]] += t["amount"]
-
+        current_month_expenses = summary.month_cat_expense
         for category, budget_amount in budgets.items():
             spent_amount = current_month_expenses.get(category, 0)
             utilization = (spent_amount / budget_amount * 100) if budget_amount > 0 else 0
@@ -130,12 +180,12 @@ def spending_alerts():
 
     # Large transaction alerts
     if transactions:
-        total_income_current_month = sum(t["amount"] for t in transactions if t["type"] == "income" and t["date"].month == datetime.now().month)
+        total_income_current_month = summary.month_income
         if total_income_current_month > 0:
-            for t in transactions:
-                if t["type"] == "expense" and t["date"].date() == datetime.now().date():
-                    if t["amount"] > (total_income_current_month * 0.2): # Over 20% of monthly income
-                        alerts.append(f"  - [orange3]Large transaction detected: {t['amount']/100:.2f} for '{t['description']}'.[/orange3]")
+            threshold = total_income_current_month * 0.2 # Over 20% of monthly income
+            for t in summary.today_expenses:
+                if t["amount"] > threshold:
+                    alerts.append(f"  - [orange3]Large transaction detected: {format_paisa(t['amount'])} for '{t['description']}'.[/orange3]")
     
     if not alerts:
         console.print("  - No active alerts. Well done!")
@@ -146,33 +196,26 @@ def spending_alerts():
 def savings_opportunities():
     """Analyzes spending to find savings opportunities."""
     console.print("\n[bold cyan]----- Savings Opportunities ----- [/bold cyan]")
-    transactions = read_transactions()
-    
-    current_month_expenses = defaultdict(int)
     today = datetime.now()
-    for t in transactions:
-        if t["type"] == "expense" and t["date"].month == today.month and t["date"].year == today.year:
-            current_month_expenses[t["category"]] += t["amount"]
+    current_month_expenses = read_month_expenses(today.year, today.month)
 
     if not current_month_expenses:
         console.print("[yellow]Not enough spending data to identify savings opportunities.[/yellow]")
         return
         
     # Find top spending category that is not a "bill"
-    top_category = None
-    top_amount = 0
-    for category, amount in sorted(current_month_expenses.items(), key=lambda item: item[1], reverse=True):
-        if category.lower() not in ["bills", "health", "transport"]: # Exclude essentials
-            top_category = category
-            top_amount = amount
-            break
+    top_category, top_amount = max(
+        ((category, amount) for category, amount in current_month_expenses.items() if category.lower() not in _NON_DISCRETIONARY),
+        key=lambda item: item[1],
+        default=(None, 0)
+    )
             
     if not top_category:
         console.print("[green]Your spending on non-essential categories is well-managed this month![/green]")
         return
 
     console.print("\n[bold]Spending Reduction Suggestion:[/bold]")
-    console.print(f"Your top discretionary spending category this month is [bold]'{top_category}'[/bold] with a total of {top_amount / 100:.2f}.")
+    console.print(f"Your top discretionary spending category this month is [bold]'{top_category}'[/bold] with a total of {format_paisa(top_amount)}.")
 
     # Suggest a 20% reduction
     reduction_percentage = 20
@@ -202,7 +245,7 @@ def set_financial_goal():
         # For simplicity, we'll store a "current amount" of 0.
         # A more complex system might allocate savings.
         with open("database/goals.txt", "a") as f:
-            f.write(f"{goal_name},{target_amount_paisa},0\n")
+            f.write(f"{clean_field(goal_name)},{target_amount_paisa},0\n")
         
         console.print(f"[green]Goal '{goal_name}' set successfully![/green]")
 
@@ -215,21 +258,19 @@ def view_financial_goals():
     console.print("\n[bold cyan]----- Your Financial Goals ----- [/bold cyan]")
     try:
         with open("database/goals.txt", "r") as f:
-            goals = f.readlines()
+            content = f.read()
         
-        if not goals:
+        if not content:
             console.print("[yellow]You have not set any financial goals yet.[/yellow]")
             return
 
-        transactions = read_transactions()
-        total_income = sum(t["amount"] for t in transactions if t["type"] == "income")
-        total_expense = sum(t["amount"] for t in transactions if t["type"] == "expense")
+        total_income, total_expense = _get_totals()
         # Simplified: total net savings is considered the "current amount" for all goals.
         current_savings = total_income - total_expense
         
-        console.print(f"Your current total savings available is [bold green]{current_savings / 100:.2f}[/bold green].\n")
+        console.print(f"Your current total savings available is [bold green]{format_paisa(current_savings)}[/bold green].\n")
 
-        for goal in goals:
+        for goal in content.split('\n'):
             parts = goal.strip().split(',')
             if len(parts) == 3:
                 name, target_paisa_str, _ = parts
@@ -238,15 +279,15 @@ def view_financial_goals():
                 progress_percent = (current_savings / target_paisa * 100) if target_paisa > 0 else 0
                 progress_percent = min(progress_percent, 100) # Cap at 100%
 
-                console.print(f"[bold]{name}[/bold] (Target: {target_paisa/100:.2f})")
+                console.print(f"[bold]{name}[/bold] (Target: {format_paisa(target_paisa)})")
                 
-                progress_bar_length = 40
-                filled_length = int(progress_bar_length * (progress_percent / 100))
+                progress_bar_length = _GOAL_BAR_LENGTH
+                filled_length = max(0, int(progress_bar_length * (progress_percent / 100)))
                 empty_length = progress_bar_length - filled_length
-                progress_bar = f"[green]{'█' * filled_length}[/green][white]{'░' * empty_length}[/white]"
+                progress_bar = f"[green]{_FULL_BAR[:filled_length]}[/green][white]{_EMPTY_BAR[:empty_length]}[/white]"
 
                 console.print(f"{progress_bar} {progress_percent:.1f}%")
-                console.print(f"  Saved: {min(current_savings, target_paisa) / 100:.2f} / {target_paisa / 100:.2f}\n")
+                console.print(f"  Saved: {format_paisa(min(current_savings, target_paisa))} / {format_paisa(target_paisa)}\n")
     
     except FileNotFoundError:
         console.print("[yellow]You have not set any financial goals yet.[/yellow]")
@@ -3,8 +3,17 @@ from rich.console import Console
 from rich.table import Table
 from datetime import datetime, timedelta
 
+from features.analytics.analytics import transactions_file_key, record_transaction_in_aggregate, parse_date, format_paisa, clean_field
+
 # TODO: Implement the functions below
 
+def _append_transaction(line):
+    """Appends one line to transactions.txt in a single write and keeps the month aggregate current."""
+    previous_key = transactions_file_key()
+    with open("database/transactions.txt", "a") as f:
+        f.write(line + "\n")
+    record_transaction_in_aggregate(previous_key, line)
+
 def add_expense():
     """Adds an expense transaction."""
     console = Console()
@@ -35,8 +44,8 @@ def add_expense():
         ).ask()
         if date_str is None: return
 
-        with open("database/transactions.txt", "a") as f:
-            f.write(f"{date_str},expense,{category},{description},{amount}\n")
+        line = f"{date_str},expense,{category},{clean_field(description)},{amount}"
+        _append_transaction(line)
         
         console.print("[green]Expense added successfully![/green]")
 
@@ -73,8 +82,8 @@ def add_income():
         ).ask()
         if date_str is None: return
 
-        with open("database/transactions.txt", "a") as f:
-            f.write(f"{date_str},income,{category},{description},{amount}\n")
+        line = f"{date_str},income,{category},{clean_field(description)},{amount}"
+        _append_transaction(line)
         
         console.print("[green]Income added successfully![/green]")
 
@@ -108,13 +117,25 @@ def list_transactions():
         today = datetime.now()
         seven_days_ago = today - timedelta(days=7)
         
-        # Parse and sort transactions
+        # Parse, filter and sort transactions
         parsed_transactions = []
         for t in transactions:
+            # Lines without exactly five fields are malformed; skip them without raising
+            if t.count(',') != 4:
+                continue
             try:
                 date_str, type, category, description, amount_str = t.strip().split(',')
+
+                # Apply filters before sorting so dropped rows are never sorted
+                if filter_choice == "Expenses only" and type != 'expense':
+                    continue
+                if filter_choice == "Income only" and type != 'income':
+                    continue
+
                 amount = int(amount_str)
-                date = datetime.strptime(date_str, '%Y-%m-%d')
+                date = parse_date(date_str)
+                if filter_choice == "Last 7 days" and date < seven_days_ago:
+                    continue
                 parsed_transactions.append((date, type, category, description, amount))
             except ValueError:
                 # Skip malformed lines
@@ -125,16 +146,7 @@ def list_transactions():
 
 
         for date, type, category, description, amount in parsed_transactions:
-            
-            # Apply filters
-            if filter_choice == "Last 7 days" and date < seven_days_ago:
-                continue
-            if filter_choice == "Expenses only" and type != 'expense':
-                continue
-            if filter_choice == "Income only" and type != 'income':
-                continue
-
-            amount_display = f"{amount / 100:.2f}"
+            amount_display = format_paisa(amount)
             style = "red" if type == 'expense' else "green"
             table.add_row(
                 date.strftime('%Y-%m-%d'),
@@ -164,13 +176,18 @@ def show_balance():
 
         total_income = 0
         total_expenses = 0
-        current_month = datetime.now().month
-        current_year = datetime.now().year
+        now = datetime.now()
+        current_month = now.month
+        current_year = now.year
+        month_prefix = f"{current_year:04d}-{current_month:02d}-"
 
         for t in transactions:
+            # Rows laid out as YYYY-MM-DD for another month can be skipped without parsing
+            if t[4:5] == '-' and t[7:8] == '-' and not t.startswith(month_prefix):
+                continue
             try:
                 date_str, type, _, _, amount_str = t.strip().split(',')
-                date = datetime.strptime(date_str, '%Y-%m-%d')
+                date = parse_date(date_str)
                 if date.month == current_month and date.year == current_year:
                     amount = int(amount_str)
                     if type == 'income':
@@ -188,9 +205,9 @@ def show_balance():
         table.add_column("Category", style="bold")
         table.add_column("Amount", justify="right")
 
-        table.add_row("Total Income", f"[green]{total_income / 100:.2f}[/green]")
-        table.add_row("Total Expenses", f"[red]{total_expenses / 100:.2f}[/red]")
-        table.add_row("Balance", f"[{balance_style}]{balance / 100:.2f}[/{balance_style}]")
+        table.add_row("Total Income", f"[green]{format_paisa(total_income)}[/green]")
+        table.add_row("Total Expenses", f"[red]{format_paisa(total_expenses)}[/red]")
+        table.add_row("Balance", f"[{balance_style}]{format_paisa(balance)}[/{balance_style}]")
 
         console.print(table)
 
@@ -1,44 +1,198 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from collections import defaultdict
 import os
 import shutil
+import tempfile
 import json
 import csv
+import io
+import threading
+import warnings
+from pandas.api.types import union_categoricals
+
+from features.analytics.analytics import clean_field
+from features.data_management.data_management import recover_interrupted_restore
 
 st.set_page_config(layout="wide", page_title="Finance Tracker")
 
 # --- Data Loading and Caching ---
-@st.cache_data
+TRANSACTION_COLUMNS = ["date", "type", "category", "description", "amount"]
+
+def _empty_transactions():
+    return pd.DataFrame(columns=TRANSACTION_COLUMNS + ["period_m"])
+
+def _parse_transactions(source):
+    """Parses transactions.txt lines from a path or binary buffer into the typed frame, amounts in integer paisa.
+
+    Returns (frame, unreadable_rows): five-field rows whose date or amount don't parse are dropped and counted.
+    """
+    # One C-tokenizer pass. A sentinel sixth column catches lines with extra commas: without it
+    # (or with index_col inferred) a six-field line turns its first field into the index and
+    # shifts every column; index_col=False truncates longer lines instead, leaving _extra set.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", pd.errors.ParserWarning) # The truncation warning
+        df = pd.read_csv(
+            source,
+            header=None,
+            names=TRANSACTION_COLUMNS + ["_extra"],
+            index_col=False,
+            dtype=str,
+            keep_default_na=False,
+            quoting=csv.QUOTE_NONE,
+            on_bad_lines="skip",
+            engine="c",
+        )
+    # Lines with fewer than five fields come back padded; lines with more are skipped like before
+    df = df[(df["amount"] != "") & (df["_extra"] == "")].drop(columns="_extra")
+    # Normalized once here so the cached frame is ready for every page. Coerced rather than raised,
+    # so one bad row is skipped instead of failing the whole file; the old line-by-line reader
+    # stripped each line first, which the strips keep.
+    dates = pd.to_datetime(df["date"].str.strip(), format="%Y-%m-%d", errors="coerce")
+    amounts = pd.to_numeric(df["amount"].str.strip(), errors="coerce")
+    readable = dates.notna() & amounts.notna() & (amounts % 1 == 0)
+    unreadable_rows = int((~readable).sum())
+    df = df[readable].copy()
+    df["date"] = dates[readable]
+    df["amount"] = amounts[readable].astype("int64")
+    df["period_m"] = df["date"].values.astype("datetime64[M]") # Month start, for one-compare month filters
+    # A handful of distinct values, so compare and group on integer codes
+    df["type"] = df["type"].astype("category")
+    df["category"] = df["category"].astype("category") # Group on these with observed=True
+    df["description"] = df["description"].astype("string[pyarrow]") # One Arrow buffer instead of a Python str per row
+    return df.reset_index(drop=True), unreadable_rows
+
+def _append_transactions(df, new):
+    """Concatenates newly parsed rows onto the cached frame, keeping type/category categorical."""
+    if df.empty:
+        return new
+    if new.empty:
+        return df
+    combined = pd.concat([df, new], ignore_index=True)
+    for column in ("type", "category"):
+        combined[column] = union_categoricals([df[column], new[column]])
+    return combined
+
+def file_key(path):
+    """Returns the (st_ino, st_mtime_ns, st_size) of a database file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+def transactions_file_key():
+    return file_key("database/transactions.txt")
+
+# Bytes kept from just before the parsed offset; an append leaves them in place, an edit or swap rarely does
+_BOUNDARY_CHECK_BYTES = 4096
+
+@st.cache_resource
+def _transactions_state():
+    """Parsed transactions shared by all sessions: complete lines up to `offset`, plus the frame for `key`."""
+    return {
+        "lock": threading.Lock(), "key": None, "offset": 0, "boundary": b"",
+        "base": None, "base_unreadable": 0, "df": None, "unreadable": 0,
+    }
+
 def load_transactions():
-    """Reads transactions from the database file."""
-    transactions = []
+    """Returns transactions as a DataFrame, warning about any lines that could not be read."""
+    df, unreadable_rows, error = _current_transactions()
+    if error is not None:
+        st.error(f"Error reading transactions: {error}")
+    elif unreadable_rows:
+        st.warning(f"Skipped {unreadable_rows} unreadable line(s) in transactions.txt.")
+    return df
+
+def _current_transactions():
+    """Returns (frame, unreadable_rows, error), parsing only the bytes appended since the file was last read."""
+    state = _transactions_state()
     try:
         if not os.path.exists("database/transactions.txt"):
             os.makedirs("database", exist_ok=True) # Ensure directory exists
             with open("database/transactions.txt", "w") as f: # Create if not exists
                 pass
-        with open("database/transactions.txt", "r") as f:
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) == 5:
-                    date_str, type, category, description, amount_str = parts
-                    transactions.append({
-                        "date": datetime.strptime(date_str, '%Y-%m-%d'),
-                        "type": type,
-                        "category": category,
-                        "description": description,
-                        "amount": int(amount_str)
-                    })
+        key = transactions_file_key()
+        with state["lock"]:
+            if key == state["key"]:
+                return state["df"], state["unreadable"], None
+            with open("database/transactions.txt", "rb") as f:
+                # Only a plain append (same file, larger, consumed bytes unchanged) is read from the offset.
+                # A restore swaps in a new file and a hand edit rewrites it, so those start over.
+                previous = state["key"]
+                appended = state["base"] is not None and previous is not None and key[0] == previous[0] and key[2] > previous[2]
+                if appended:
+                    f.seek(state["offset"] - len(state["boundary"]))
+                    appended = f.read(len(state["boundary"])) == state["boundary"]
+                if not appended:
+                    state.update(offset=0, boundary=b"", base=_empty_transactions(), base_unreadable=0)
+                f.seek(state["offset"])
+                tail = f.read()
+            complete = tail.rfind(b"\n") + 1 # Only whole lines join the base frame
+            if complete:
+                new, new_unreadable = _parse_transactions(io.BytesIO(tail[:complete]))
+                state["base"] = _append_transactions(state["base"], new)
+                state["base_unreadable"] += new_unreadable
+                state["offset"] += complete
+                state["boundary"] = (state["boundary"] + tail[:complete])[-_BOUNDARY_CHECK_BYTES:]
+            df, unreadable_rows = state["base"], state["base_unreadable"]
+            if tail[complete:].strip(): # A last line without its newline still shows, but is re-read next time
+                pending, pending_unreadable = _parse_transactions(io.BytesIO(tail[complete:]))
+                df = _append_transactions(df, pending)
+                unreadable_rows += pending_unreadable
+            state.update(key=key, df=df, unreadable=unreadable_rows)
+            return df, unreadable_rows, None
     except FileNotFoundError:
         pass # Should not happen after creating the file
     except Exception as e:
-        st.error(f"Error reading transactions: {e}")
-    return transactions
+        # Rows parsed before the failure are still good; only the unread tail is missing
+        if state["base"] is not None:
+            return state["base"], state["base_unreadable"], e
+        return _empty_transactions(), 0, e
+    return _empty_transactions(), 0, None
+
+@st.cache_data(max_entries=1)
+def _monthly_category_totals(file_key):
+    df = _current_transactions()[0]
+    if df.empty:
+        return pd.Series(dtype="int64")
+    return df.groupby([df['date'].dt.to_period('M'), 'type', 'category'], observed=True)['amount'].sum()
+
+def load_monthly_category_totals():
+    """Sums transaction amounts per (month period, type, category) once per file change, for O(1) lookups."""
+    return _monthly_category_totals(transactions_file_key())
+
+@st.cache_data(max_entries=1)
+def _daily_expense_totals(file_key):
+    df = _current_transactions()[0]
+    if df.empty:
+        return pd.Series(dtype="int64")
+    return df[df['type'] == 'expense'].groupby('date')['amount'].sum()
+
+def load_daily_expense_totals():
+    """Sums expense amounts per day once per file change, so a day's spending is a single lookup."""
+    return _daily_expense_totals(transactions_file_key())
+
+@st.cache_data(max_entries=2) # The ten-row dashboard slice and the full list
+def _transactions_newest_first(file_key, limit):
+    df = _current_transactions()[0][TRANSACTION_COLUMNS]
+    if limit is None:
+        return df.sort_values(by="date", ascending=False)
+    return df.nlargest(limit, "date") # Partial selection; no full sort for a few rows
+
+def load_transactions_newest_first(limit=None):
+    """Returns the transaction columns sorted newest first (optionally only `limit` rows), once per file change."""
+    return _transactions_newest_first(transactions_file_key(), limit)
+
+def month_type_totals(category_totals, period, trans_type):
+    """Returns the per-category Series for one month and type from the cached totals (empty if none)."""
+    try:
+        return category_totals.loc[(period, trans_type)]
+    except KeyError:
+        return pd.Series(dtype="int64", name="amount")
 
-@st.cache_data
-def load_budgets():
+def _read_budgets_file():
     """Reads budgets from the database file."""
     budgets = {}
     try:
@@ -58,33 +212,150 @@ def load_budgets():
         st.error(f"Error reading budgets: {e}")
     return budgets
 
+@st.cache_data(max_entries=1)
+def _cached_budgets(file_key):
+    return _read_budgets_file()
+
+def load_budgets():
+    """Returns budgets, re-reading budgets.txt whenever it changes (the CLI writes it too)."""
+    return _cached_budgets(file_key("database/budgets.txt"))
+
+GOAL_COLUMNS = ["name", "target_paisa", "saved_paisa"]
+
+@st.cache_data(max_entries=1)
+def _cached_goals(file_key):
+    if file_key[2] == 0:
+        return pd.DataFrame(columns=GOAL_COLUMNS)
+    # Same _extra sentinel as _parse_transactions, so a name with a comma can't shift the columns
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", pd.errors.ParserWarning)
+        goals = pd.read_csv(
+            "database/goals.txt",
+            header=None,
+            names=GOAL_COLUMNS + ["_extra"],
+            index_col=False,
+            dtype=str,
+            keep_default_na=False,
+            quoting=csv.QUOTE_NONE,
+            on_bad_lines="skip",
+            engine="c",
+        )
+    # Only well-formed name,target,saved lines with an integer target, like the line-by-line reader
+    target = goals["target_paisa"].str.strip()
+    goals = goals[(goals["saved_paisa"] != "") & (goals["_extra"] == "") & target.str.fullmatch(r"[+-]?\d+")]
+    return goals.drop(columns="_extra").astype({"target_paisa": "int64"}).reset_index(drop=True)
+
+def load_goals():
+    """Reads financial goals into a DataFrame once per change to goals.txt; raises FileNotFoundError if no goal was ever set."""
+    key = file_key("database/goals.txt")
+    if key is None:
+        raise FileNotFoundError("database/goals.txt")
+    return _cached_goals(key)
+
 # --- Helper Functions for Data Writing ---
 def write_transaction_to_file(date, trans_type, category, description, amount_paisa):
-    """Appends a new transaction to transactions.txt and clears cache."""
+    """Appends a new transaction to transactions.txt; the next load picks it up from the file's stat."""
     with open("database/transactions.txt", "a") as f:
-        f.write(f"{date.strftime('%Y-%m-%d')},{trans_type},{category},{description},{amount_paisa}\n")
-    st.cache_data.clear()
-    st.rerun() # Rerun to refresh displayed data
+        f.write(f"{date.strftime('%Y-%m-%d')},{trans_type},{category},{clean_field(description)},{amount_paisa}\n")
 
 def write_budget_to_file(category, amount_paisa):
-    """Appends a new budget to budgets.txt and clears cache."""
-    # A more robust system would update existing budgets, but for this, we append.
-    # To update, one would read all budgets, modify, then rewrite the file.
-    with open("database/budgets.txt", "a") as f:
-        f.write(f"{category},{amount_paisa}\n")
-    st.cache_data.clear()
-    st.rerun() # Rerun to refresh displayed data
+    """Sets a budget by atomically rewriting budgets.txt with one line per category."""
+    budgets = _read_budgets_file() # Read fresh, or a budget the CLI just added would be dropped
+    budgets[category] = amount_paisa # Updating keeps the category's original position
+    tmp_path = None
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir="database", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write("".join(f"{name},{paisa}\n" for name, paisa in budgets.items()))
+        if os.path.exists("database/budgets.txt"):
+            shutil.copymode("database/budgets.txt", tmp_path) # mkstemp files start out private
+        os.replace(tmp_path, "database/budgets.txt")
+    except Exception:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 # --- UI Pages ---
 
+def _progress_style_block(color):
+    return f"""
+    <style>
+        .stProgress > div > div > div > div {{
+            background-color: {color};
+        }}
+    </style>"""
+
+# Budget progress bar styles, built once instead of per card
+GREEN_PROGRESS_STYLE = _progress_style_block("#4CAF50")
+AMBER_PROGRESS_STYLE = _progress_style_block("#FFC107")
+RED_PROGRESS_STYLE = _progress_style_block("#F44336")
+
+def progress_bar_style(utilization):
+    """Returns the style block for a budget's progress bar: green under 70%, amber under 100%, else red."""
+    if utilization < 70:
+        return GREEN_PROGRESS_STYLE
+    elif utilization < 100:
+        return AMBER_PROGRESS_STYLE
+    return RED_PROGRESS_STYLE
+
+def format_rupees(paisa):
+    """Formats an integer paisa amount for display; amounts stay in paisa until this point."""
+    return f"Rs. {paisa / 100:,.2f}"
+
+def style_type(series):
+    """Colors the transaction type column: green for income, red for everything else."""
+    return np.where(series.values == 'income', 'color: green', 'color: red')
+
+# Shared by every styled table instead of being rebuilt per call
+AMOUNT_FORMAT = {"amount": format_rupees}
+TYPE_SUBSET = ["type"]
+TRANSACTIONS_PAGE_SIZE = 50
+
+def style_transactions(df):
+    """Styles a transaction table: colored type column and amounts shown in rupees."""
+    return df.style.apply(style_type, subset=TYPE_SUBSET).format(AMOUNT_FORMAT)
+
+def render_budget_cards(spent_by_category, budgets):
+    """Shows a card per budget, three per row, with spending looked up in the month's category totals."""
+    cols_per_row = 3
+    budget_items = list(budgets.items())
+    last_progress_style = None
+
+    # Split budgets into rows for display
+    for i in range(0, len(budget_items), cols_per_row):
+        current_row_budgets = budget_items[i : i + cols_per_row]
+        cols = st.columns(len(current_row_budgets)) # Create columns for only this row's budgets
+        
+        for col_idx, (category, budget_amount_paisa) in enumerate(current_row_budgets):
+            with cols[col_idx]:
+                # Safely get spent amount, ensuring it's 0 if no expenses for category
+                spent = spent_by_category.get(category, 0)
+                utilization = (spent / budget_amount_paisa * 100) if budget_amount_paisa > 0 else 0
+                
+                st.subheader(category)
+                st.write(f"Budget: {format_rupees(budget_amount_paisa)}")
+                st.write(f"Spent: {format_rupees(spent)}")
+
+                # Pick the progress bar color; the style block is only re-sent when it changes
+                progress_style = progress_bar_style(utilization)
+                if progress_style is not last_progress_style:
+                    st.markdown(progress_style, unsafe_allow_html=True)
+                    last_progress_style = progress_style
+                st.progress(min(utilization / 100, 1.0))
+                st.write(f"Utilization: {utilization:.1f}%")
+
+                if utilization > 100:
+                    st.error(f"Over budget by {format_rupees(spent - budget_amount_paisa)}!")
+
 def dashboard_page():
     st.title("Dashboard")
     st.markdown("A quick overview of your financial health for the current month.")
 
     transactions = load_transactions()
     budgets = load_budgets()
+    now = datetime.now()
 
-    if not transactions:
+    if transactions.empty:
         st.warning("No transaction data. Please add transactions or import data.")
         # Display placeholders for balance and budget if no transactions
         st.header("Current Month's Financial Overview")
@@ -100,28 +371,28 @@ def dashboard_page():
         st.info("No recent transactions.")
         return
 
-    df = pd.DataFrame(transactions)
-    df['amount'] = df['amount'] / 100
-    df['date'] = pd.to_datetime(df['date'])
+    df = transactions
     
-    current_month_df = df[df['date'].dt.month == datetime.now().month]
+    current_month_df = df[df['period_m'] == np.datetime64(now, 'M')]
+    category_totals = load_monthly_category_totals()
+    current_period = pd.Period(now, 'M')
 
     # --- Balance Section ---
     st.header("Current Month's Financial Overview")
     if current_month_df.empty:
         st.info("No transactions recorded for the current month.")
-        total_income = 0.0
-        total_expense = 0.0
-        balance = 0.0
+        total_income = 0
+        total_expense = 0
+        balance = 0
     else:
-        total_income = current_month_df[current_month_df['type'] == 'income']['amount'].sum()
-        total_expense = current_month_df[current_month_df['type'] == 'expense']['amount'].sum()
+        total_income = month_type_totals(category_totals, current_period, 'income').sum()
+        total_expense = month_type_totals(category_totals, current_period, 'expense').sum()
         balance = total_income - total_expense
     
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Income", f"Rs. {total_income:,.2f}")
-    col2.metric("Total Expense", f"Rs. {total_expense:,.2f}")
-    col3.metric("Current Balance", f"Rs. {balance:,.2f}")
+    col1.metric("Total Income", format_rupees(total_income))
+    col2.metric("Total Expense", format_rupees(total_expense))
+    col3.metric("Current Balance", format_rupees(balance))
 
     st.markdown("---")
 
@@ -130,65 +401,16 @@ def dashboard_page():
     if not budgets:
         st.info("No budgets have been set.")
     else:
-        num_budgets = len(budgets)
-        cols_per_row = 3
-        
-        # Determine how many columns are actually needed, max 3 per row
-        num_effective_cols = min(num_budgets, cols_per_row)
-        if num_effective_cols == 0: # Handle case where budgets dict might be empty but not None
-            st.info("No budgets have been set.")
-            return
-
-        budget_items = list(budgets.items())
-        
-        # Split budgets into rows
-        for i in range(0, num_budgets, cols_per_row):
-            current_row_budgets = budget_items[i : i + cols_per_row]
-            cols = st.columns(len(current_row_budgets)) # Create columns for only this row's budgets
-            
-            for col_idx, (category, budget_amount_paisa) in enumerate(current_row_budgets):
-                with cols[col_idx]:
-                    budget_amount = budget_amount_paisa / 100
-                    # Safely get spent amount, ensuring it's 0 if no expenses for category
-                    spent = current_month_df[(current_month_df['category'] == category) & (current_month_df['type'] == 'expense')]['amount'].sum() if not current_month_df.empty else 0.0
-                    utilization = (spent / budget_amount * 100) if budget_amount > 0 else 0
-                    
-                    st.subheader(category)
-                    
-                    st.write(f"Budget: Rs. {budget_amount:,.2f}")
-                    st.write(f"Spent: Rs. {spent:,.2f}")
-
-                    # Determine color for the progress bar
-                    if utilization < 70:
-                        progress_color_style = "#4CAF50" # Green
-                    elif 70 <= utilization < 100:
-                        progress_color_style = "#FFC107" # Amber
-                    else:
-                        progress_color_style = "#F44336" # Red
-                    
-                    st.markdown(f"""
-                        <style>
-                            .stProgress > div > div > div > div {{
-                                background-color: {progress_color_style};
-                            }}
-                        </style>""", unsafe_allow_html=True)
-                    st.progress(min(utilization / 100, 1.0))
-                    st.write(f"Utilization: {utilization:.1f}%")
-
-                    if utilization > 100:
-                        st.error(f"Over budget by Rs. {spent - budget_amount:,.2f}!")
+        spent_by_category = month_type_totals(category_totals, current_period, 'expense')
+        render_budget_cards(spent_by_category, budgets)
     
     st.markdown("---")
     
     # --- Recent Transactions Table ---
     st.header("Recent Transactions")
     if not df.empty:
-        def style_type(series):
-            return ['color: green' if val == 'income' else 'color: red' for val in series]
         st.dataframe(
-            df.sort_values(by="date", ascending=False).head(10)
-            .style.apply(style_type, subset=['type'])
-            .format({"amount": "Rs. {:,.2f}"}),
+            style_transactions(load_transactions_newest_first(10)),
             use_container_width=True
         )
     else:
@@ -217,25 +439,20 @@ def transactions_page():
             if submitted:
                 write_transaction_to_file(date, trans_type, category, description, int(amount*100))
                 st.success("Transaction added!")
-                # st.rerun() is already in write_transaction_to_file
 
 
     st.header("All Transactions")
     transactions = load_transactions()
-    if transactions:
-        df = pd.DataFrame(transactions)
-        df['amount'] = df['amount'] / 100
-        df['date'] = pd.to_datetime(df['date'])
-        
-        def style_type(series):
-            return ['color: green' if val == 'income' else 'color: red' for val in series]
-            
+    if not transactions.empty:
+        # Only one page of rows is styled and sent to the browser
+        page_count = (len(transactions) - 1) // TRANSACTIONS_PAGE_SIZE + 1
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key="transactions_page_input")
+        start = (page - 1) * TRANSACTIONS_PAGE_SIZE
         st.dataframe(
-            df.sort_values(by="date", ascending=False)
-            .style.apply(style_type, subset=['type'])
-            .format({"amount": "Rs. {:,.2f}"}),
+            style_transactions(load_transactions_newest_first().iloc[start:start + TRANSACTIONS_PAGE_SIZE]),
             use_container_width=True
         )
+        st.caption(f"Page {page} of {page_count} ({len(transactions)} transactions)")
     else:
         st.info("No transactions yet.")
 
@@ -255,6 +472,7 @@ def budgets_page():
 
     transactions = load_transactions()
     budgets = load_budgets()
+    now = datetime.now()
 
     if not budgets:
         st.info("No budgets have been set. Use the form above to set your monthly budgets.")
@@ -262,58 +480,19 @@ def budgets_page():
 
     st.header("Current Month's Budget Tracking")
 
-    if not transactions:
+    if transactions.empty:
         st.info("No transactions recorded to track against budgets for the current month.")
         return
     
-    df = pd.DataFrame(transactions)
-    df['amount'] = df['amount'] / 100
-    df['date'] = pd.to_datetime(df['date'])
-    current_month_df = df[df['date'].dt.month == datetime.now().month]
+    df = transactions
+    current_month_df = df[df['period_m'] == np.datetime64(now, 'M')]
 
     if current_month_df.empty:
         st.info("No transactions for the current month to track against budgets.")
         return
 
-    num_budgets = len(budgets)
-    cols_per_row = 3
-    
-    budget_items = list(budgets.items())
-
-    # Split budgets into rows for display
-    for i in range(0, num_budgets, cols_per_row):
-        current_row_budgets = budget_items[i : i + cols_per_row]
-        cols = st.columns(len(current_row_budgets)) # Create columns for only this row's budgets
-        
-        for col_idx, (category, budget_amount_paisa) in enumerate(current_row_budgets):
-            with cols[col_idx]:
-                budget_amount = budget_amount_paisa / 100
-                spent = current_month_df[(current_month_df['category'] == category) & (current_month_df['type'] == 'expense')]['amount'].sum()
-                utilization = (spent / budget_amount * 100) if budget_amount > 0 else 0
-                
-                st.subheader(category)
-                st.write(f"Budget: Rs. {budget_amount:,.2f}")
-                st.write(f"Spent: Rs. {spent:,.2f}")
-
-                # Determine color for the progress bar
-                if utilization < 70:
-                    progress_color_style = "#4CAF50" # Green
-                elif 70 <= utilization < 100:
-                    progress_color_style = "#FFC107" # Amber
-                else:
-                    progress_color_style = "#F44336" # Red
-                
-                st.markdown(f"""
-                    <style>
-                        .stProgress > div > div > div > div {{
-                            background-color: {progress_color_style};
-                        }}
-                    </style>""", unsafe_allow_html=True)
-                st.progress(min(utilization / 100, 1.0))
-                st.write(f"Utilization: {utilization:.1f}%")
-
-                if utilization > 100:
-                    st.error(f"Over budget by Rs. {spent - budget_amount:,.2f}!")
+    spent_by_category = month_type_totals(load_monthly_category_totals(), pd.Period(now, 'M'), 'expense')
+    render_budget_cards(spent_by_category, budgets)
 
 def analytics_page():
     st.title("Financial Analytics")
@@ -322,31 +501,35 @@ def analytics_page():
     transactions = load_transactions()
     budgets = load_budgets()
 
-    if not transactions:
+    if transactions.empty:
         st.warning("No transaction data available for analytics.")
         return
 
-    df = pd.DataFrame(transactions)
-    df['amount'] = df['amount'] / 100
-    df['date'] = pd.to_datetime(df['date'])
+    df = transactions
     
-    current_month = datetime.now().month
-    current_year = datetime.now().year
-    current_month_df = df[df['date'].dt.month == current_month]
+    now = datetime.now()
+    current_month_df = df[df['period_m'] == np.datetime64(now, 'M')]
+    category_totals = load_monthly_category_totals()
+    current_period = pd.Period(now, 'M')
+    # This month's per-category sums; every figure below is read from these small Series
+    expense_totals = month_type_totals(category_totals, current_period, 'expense')
+    income_totals = month_type_totals(category_totals, current_period, 'income')
 
     # --- Spending Analysis ---
     st.header("Spending Analysis")
     if not current_month_df.empty:
-        expense_df = current_month_df[current_month_df['type'] == 'expense']
-        if not expense_df.empty:
-            spending_by_category = expense_df.groupby('category')['amount'].sum().sort_values(ascending=False)
+        if not expense_totals.empty:
+            spending_by_category = expense_totals.sort_values(ascending=False)
             
             st.subheader("Spending Breakdown by Category")
-            st.dataframe(spending_by_category.to_frame().style.format({"amount": "Rs. {:,.2f}"}))
+            st.dataframe(spending_by_category.to_frame().style.format(AMOUNT_FORMAT))
             
             st.subheader("Top 3 Spending Categories")
-            for i, (category, amount) in enumerate(spending_by_category.head(3).items()):
-                st.write(f"{i+1}. {category}: Rs. {amount:,.2f}")
+            # One markdown list instead of a separate element per line
+            st.markdown("\n".join(
+                f"{i+1}. {category}: {format_rupees(amount)}"
+                for i, (category, amount) in enumerate(spending_by_category.head(3).items())
+            ))
         else:
             st.info("No expenses recorded for the current month.")
     else:
@@ -355,11 +538,10 @@ def analytics_page():
     # --- Income Analysis ---
     st.header("Income Analysis")
     if not current_month_df.empty:
-        income_df = current_month_df[current_month_df['type'] == 'income']
-        if not income_df.empty:
-            income_by_source = income_df.groupby('category')['amount'].sum().sort_values(ascending=False)
+        if not income_totals.empty:
+            income_by_source = income_totals.sort_values(ascending=False)
             st.subheader("Income by Source")
-            st.dataframe(income_by_source.to_frame().style.format({"amount": "Rs. {:,.2f}"}))
+            st.dataframe(income_by_source.to_frame().style.format(AMOUNT_FORMAT))
         else:
             st.info("No income recorded for the current month.")
     else:
@@ -367,13 +549,13 @@ def analytics_page():
 
     # --- Savings Analysis ---
     st.header("Savings Analysis")
-    total_income_current_month = current_month_df[current_month_df['type'] == 'income']['amount'].sum()
-    total_expense_current_month = current_month_df[current_month_df['type'] == 'expense']['amount'].sum()
+    total_income_current_month = income_totals.sum()
+    total_expense_current_month = expense_totals.sum()
     net_savings_current_month = total_income_current_month - total_expense_current_month
     savings_rate_current_month = (net_savings_current_month / total_income_current_month * 100) if total_income_current_month > 0 else 0
     
     st.subheader("Current Month's Savings")
-    st.metric("Net Savings", f"Rs. {net_savings_current_month:,.2f}")
+    st.metric("Net Savings", format_rupees(net_savings_current_month))
     st.metric("Savings Rate", f"{savings_rate_current_month:,.1f}%")
 
     # --- Financial Health Score ---
@@ -396,13 +578,12 @@ def analytics_page():
 
     # Budget Adherence (30 points) - simplified for web
     budget_adherence_score = 0
-    if budgets and not expense_df.empty: # Check if budgets exist AND expense_df is not empty
+    if budgets and not expense_totals.empty: # Check if budgets exist AND there are expenses this month
         over_budget_categories_count = 0
         for category, budget_amount_paisa in budgets.items():
-            budget_amount = budget_amount_paisa / 100
-            # Use .get() with default 0 to safely handle categories not in expense_df
-            spent = expense_df[expense_df['category'] == category]['amount'].sum() if category in expense_df['category'].unique() else 0
-            if spent > budget_amount:
+            # Use .get() with default 0 to safely handle categories with no expenses
+            spent = expense_totals.get(category, 0)
+            if spent > budget_amount_paisa:
                 over_budget_categories_count += 1
         
         if over_budget_categories_count == 0:
@@ -411,7 +592,7 @@ def analytics_page():
             budget_adherence_score = 15
         else:
             budget_adherence_score = 5
-    elif budgets and expense_df.empty:
+    elif budgets and expense_totals.empty:
         # If budgets exist but no expenses, perfect adherence for now.
         budget_adherence_score = 30
     else:
@@ -455,41 +636,35 @@ def smart_assistant_page():
     transactions = load_transactions()
     budgets = load_budgets()
 
-    if not transactions:
+    if transactions.empty:
         st.warning("No transaction data available for the smart assistant.")
         return
 
     # --- Daily Financial Check ---
     with st.expander("Daily Financial Check", expanded=True):
-        st.header(f"Daily Check for {datetime.now().strftime('%Y-%m-%d')}")
         today = datetime.now()
-        todays_spending = sum(
-            t["amount"] for t in transactions 
-            if t["date"].date() == today.date() and t["type"] == "expense"
-        ) / 100
+        st.header(f"Daily Check for {today.strftime('%Y-%m-%d')}")
+        todays_spending = load_daily_expense_totals().get(pd.Timestamp(today.date()), 0)
         
-        st.metric("Today's Spending", f"Rs. {todays_spending:,.2f}")
+        st.metric("Today's Spending", format_rupees(todays_spending))
         
         if budgets:
-            total_monthly_budget = sum(budgets.values()) / 100
+            total_monthly_budget = sum(budgets.values())
             days_in_month = (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
             daily_budget = total_monthly_budget / days_in_month.day if days_in_month.day > 0 else 0
             
-            st.metric("Estimated Daily Budget", f"Rs. {daily_budget:,.2f}")
+            st.metric("Estimated Daily Budget", format_rupees(daily_budget))
 
     # --- Spending Alerts ---
+    category_totals = load_monthly_category_totals()
+    current_period = pd.Period(today, 'M')
     with st.expander("Active Alerts"):
         alerts = []
         if budgets:
-            current_month_expenses = defaultdict(int)
-            for t in transactions:
-                if t["type"] == "expense" and t["date"].month == today.month:
-                    current_month_expenses[t["category"]] += t["amount"]
-
-            for category, budget_amount in budgets.items():
-                utilization = (current_month_expenses.get(category, 0) / budget_amount * 100) if budget_amount > 0 else 0
-                if utilization >= 80:
-                    alerts.append(f"High budget use for '{category}': {utilization:.1f}% used.")
+            budget_series = pd.Series(budgets)
+            spent = month_type_totals(category_totals, current_period, 'expense').reindex(budget_series.index, fill_value=0)
+            utilization = (spent / budget_series * 100).where(budget_series > 0, 0) # Zero budgets never alert
+            alerts = [f"High budget use for '{category}': {used:.1f}% used." for category, used in utilization[utilization >= 80].items()]
         
         if not alerts:
             st.success("No active alerts. Great job!")
@@ -501,8 +676,8 @@ def smart_assistant_page():
     with st.expander("Recommendations"):
         recommendations = []
         # Add more rules here based on the logic in the smart_assistant.py
-        total_income = sum(t['amount'] for t in transactions if t['type'] == 'income' and t['date'].month == today.month)
-        total_expense = sum(t['amount'] for t in transactions if t['type'] == 'expense' and t['date'].month == today.month)
+        total_income = month_type_totals(category_totals, current_period, 'income').sum()
+        total_expense = month_type_totals(category_totals, current_period, 'expense').sum()
         savings_rate = ((total_income - total_expense) / total_income * 100) if total_income > 0 else -100
 
         if savings_rate < 10:
@@ -528,34 +703,34 @@ def financial_goals_page():
             submitted = st.form_submit_button("Set Goal")
             if submitted:
                 with open("database/goals.txt", "a") as f:
-                    f.write(f"{goal_name},{int(target_amount * 100)},0\n")
+                    f.write(f"{clean_field(goal_name)},{int(target_amount * 100)},0\n")
                 st.success(f"Goal '{goal_name}' set!")
 
     # Display goals
     st.header("Your Progress")
     try:
-        with open("database/goals.txt", "r") as f:
-            goals = f.readlines()
+        goals = load_goals()
         
-        if not goals:
+        if goals.empty:
             st.info("No financial goals set yet.")
         else:
-            transactions = load_transactions()
-            total_income = sum(t["amount"] for t in transactions if t["type"] == "income")
-            total_expense = sum(t["amount"] for t in transactions if t["type"] == "expense")
-            current_savings = (total_income - total_expense) / 100
-
-            st.metric("Total Savings Available for Goals", f"Rs. {current_savings:,.2f}")
+            category_totals = load_monthly_category_totals()
+            # Folds the cached per-month rollup (a few rows per month) instead of rescanning every transaction
+            totals_by_type = category_totals.groupby(level="type", observed=True).sum() if not category_totals.empty else category_totals
+            total_income = totals_by_type.get("income", 0)
+            total_expense = totals_by_type.get("expense", 0)
+            current_savings = total_income - total_expense
+
+            st.metric("Total Savings Available for Goals", format_rupees(current_savings))
             
-            for goal in goals:
-                name, target_paisa_str, _ = goal.strip().split(',')
-                target_amount = int(target_paisa_str) / 100
+            for goal in goals.itertuples():
+                target_paisa = goal.target_paisa
                 
-                progress_percent = (current_savings / target_amount * 100) if target_amount > 0 else 0
+                progress_percent = (current_savings / target_paisa * 100) if target_paisa > 0 else 0
                 
-                st.subheader(name)
+                st.subheader(goal.name)
                 st.progress(min(progress_percent / 100, 1.0))
-                st.write(f"Rs. {min(current_savings, target_amount):,.2f} / Rs. {target_amount:,.2f} ({progress_percent:.1f}%)")
+                st.write(f"{format_rupees(min(current_savings, target_paisa))} / {format_rupees(target_paisa)} ({progress_percent:.1f}%)")
 
     except FileNotFoundError:
         st.info("No goals file found. Set your first goal above!")
@@ -565,10 +740,8 @@ def data_management_page():
     
     st.subheader("Export Data")
     if st.button("Export Transactions to CSV"):
-        transactions = load_transactions()
-        df = pd.DataFrame(transactions)
-        df['amount'] /= 100
-        csv = df.to_csv(index=False)
+        df = load_transactions()
+        csv = df[TRANSACTION_COLUMNS].assign(amount=df["amount"] / 100).to_csv(index=False) # Exported in rupees
         st.download_button("Download CSV", csv, "transactions.csv", "text/csv")
 
     st.subheader("Import Data")
@@ -579,11 +752,21 @@ def data_management_page():
             # Basic validation
             if list(df.columns) == ["date", "type", "category", "description", "amount"]:
                 if st.button("Import Data"):
-                    with open("database/transactions.txt", "a") as f:
-                        for _, row in df.iterrows():
-                            f.write(f"{row['date']},{row['type']},{row['category']},{row['description']},{int(float(row['amount'])*100)}\n")
+                    # One unparseable date would make every later load of the file fail
+                    if pd.to_datetime(df["date"], format="%Y-%m-%d", errors="coerce").isna().any():
+                        st.error("Invalid date found. Dates must be in YYYY-MM-DD format.")
+                        return
+                    # Build every line column-wise, then append them in a single write
+                    text = df[["date", "type", "category", "description"]].fillna("").astype(str)
+                    # Same cleanup as the CLI import, so no field can add a comma or line break
+                    text["category"] = text["category"].map(clean_field)
+                    text["description"] = text["description"].map(clean_field)
+                    amount_paisa = (df["amount"].astype(float) * 100).astype("int64").astype(str)
+                    lines = text["date"] + "," + text["type"] + "," + text["category"] + "," + text["description"] + "," + amount_paisa
+                    if not lines.empty:
+                        with open("database/transactions.txt", "a") as f:
+                            f.write("\n".join(lines) + "\n")
                     st.success("Data imported successfully!")
-                    st.cache_data.clear()
             else:
                 st.error("Invalid CSV format.")
         except Exception as e:
@@ -591,6 +774,8 @@ def data_management_page():
 
 # --- Main App ---
 def main():
+    # Before any loader creates an empty database/ in place of data an interrupted restore set aside
+    recover_interrupted_restore()
     st.sidebar.title("Finance Tracker")
     
     pages = {